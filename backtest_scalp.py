@@ -3,42 +3,36 @@
 HYPER-SHORT Scalping Strategy - Quick in, quick out
 """
 
+import os
+from itertools import product
+from multiprocessing import Pool
+
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
+import numba
 
-def calculate_rsi(prices, period=14):
-    """Calculate RSI indicator"""
-    delta = prices.diff()
-    gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-    rs = gain / loss
-    rsi = 100 - (100 / (1 + rs))
-    return rsi
+from pipeline.alpaca import load_or_cache
+from indicators import calculate_rsi
 
 # Load 5-minute data
 print("Loading SPY and RSP 5-minute data...")
-spy_df = pd.read_csv('data/SPY_5Min_stock_alpaca_clean.csv', index_col='Datetime', parse_dates=True)
-rsp_df = pd.read_csv('data/RSP_5Min_stock_alpaca_clean.csv', index_col='Datetime', parse_dates=True)
+spy_df = load_or_cache('data/SPY_5Min_stock_alpaca_clean.csv')
+rsp_df = load_or_cache('data/RSP_5Min_stock_alpaca_clean.csv')
 
-# Align dates
-common_dates = spy_df.index.intersection(rsp_df.index)
-spy_df = spy_df.loc[common_dates]
-rsp_df = rsp_df.loc[common_dates]
+# Align dates - one inner join instead of intersection + two label gathers
+df = spy_df[['Close']].join(rsp_df[['Close']], how='inner', rsuffix='_rsp')
 
-print(f"Loaded {len(spy_df)} 5-minute bars")
+print(f"Loaded {len(df)} 5-minute bars")
 
 # Calculate ratio and RSI
 print("Calculating SPY/RSP ratio and RSI...")
-spy_df['ratio'] = spy_df['Close'] / rsp_df['Close']
-spy_df['ratio_rsi'] = calculate_rsi(spy_df['ratio'], period=14)
+df['ratio'] = df['Close'] / df['Close_rsp']
+df['ratio_rsi'] = calculate_rsi(df['ratio'], period=14)
 
 # Drop NaN
-valid_idx = spy_df['ratio_rsi'].notna()
-spy_df = spy_df[valid_idx]
-rsp_df = rsp_df[valid_idx]
+df = df[df['ratio_rsi'].notna()]
 
-print(f"Valid data points: {len(spy_df)}")
+print(f"Valid data points: {len(df)}")
 
 # HYPER-SHORT STRATEGY PARAMETERS
 RSI_OVERBOUGHT = 65  # More sensitive (was 70)
@@ -48,141 +42,218 @@ MAX_HOLD_BARS = 12   # Maximum 12 bars = 60 minutes
 PROFIT_TARGET = 0.005  # 0.5% profit target
 STOP_LOSS = 0.003     # 0.3% stop loss
 
-# Initialize portfolio
-portfolio = {
-    'cash': 100000,
-    'spy_shares': 0,
-    'rsp_shares': 0,
-    'equity': [],
-    'dates': [],
-    'trades': [],
-    'entry_value': 0,
-    'entry_bar': 0
-}
-
-current_position = None
-bars_in_position = 0
+# Event codes for the trade log - the jitted loop records numbers only,
+# strings are formatted afterwards in Python
+EVENT_ENTER_SHORT_SPY = 0
+EVENT_ENTER_LONG_SPY = 1
+EXIT_PROFIT_TARGET = 2
+EXIT_STOP_LOSS = 3
+EXIT_TIME_LIMIT = 4
+EXIT_RSI_REVERSION = 5
 
-print("\nRunning HYPER-SHORT scalping strategy...")
-print(f"RSI Thresholds: {RSI_OVERBOUGHT}/{RSI_OVERSOLD} (tighter)")
-print(f"Max Hold: {MAX_HOLD_BARS} bars (60 minutes)")
-print(f"Profit Target: {PROFIT_TARGET*100}%")
-print(f"Stop Loss: {STOP_LOSS*100}%")
-print("="*60)
 
-bar_count = 0
-
-for date in spy_df.index:
-    bar_count += 1
-    spy_price = spy_df.loc[date, 'Close']
-    rsp_price = rsp_df.loc[date, 'Close']
-    ratio_rsi = spy_df.loc[date, 'ratio_rsi']
-    
-    # Calculate portfolio value
-    portfolio_value = portfolio['cash'] + \
-                      portfolio['spy_shares'] * spy_price + \
-                      portfolio['rsp_shares'] * rsp_price
-    
-    portfolio['equity'].append(portfolio_value)
-    portfolio['dates'].append(date)
-    
-    # If in position, check exit conditions
-    if current_position is not None:
-        bars_in_position += 1
-        position_pnl = portfolio_value - portfolio['entry_value']
-        pnl_pct = position_pnl / portfolio['entry_value']
-        
-        should_exit = False
-        exit_reason = ""
-        
-        # 1. Profit target hit
-        if pnl_pct >= PROFIT_TARGET:
-            should_exit = True
-            exit_reason = f"PROFIT TARGET ({pnl_pct*100:.2f}%)"
-        
-        # 2. Stop loss hit
-        elif pnl_pct <= -STOP_LOSS:
-            should_exit = True
-            exit_reason = f"STOP LOSS ({pnl_pct*100:.2f}%)"
-        
-        # 3. Time limit reached
-        elif bars_in_position >= MAX_HOLD_BARS:
-            should_exit = True
-            exit_reason = f"TIME LIMIT ({bars_in_position} bars)"
-        
-        # 4. RSI mean reversion (original exit)
-        elif current_position == 'short_spy_long_rsp' and ratio_rsi < 50:
-            should_exit = True
-            exit_reason = f"RSI REVERSION ({ratio_rsi:.1f})"
-        elif current_position == 'long_spy_short_rsp' and ratio_rsi > 50:
-            should_exit = True
-            exit_reason = f"RSI REVERSION ({ratio_rsi:.1f})"
-        
-        if should_exit:
-            # Close position
-            portfolio['cash'] += portfolio['spy_shares'] * spy_price
-            portfolio['cash'] += portfolio['rsp_shares'] * rsp_price
-            
-            portfolio['trades'].append(
-                f"{date}: CLOSE | {exit_reason} | Held {bars_in_position} bars | PnL: ${position_pnl:.2f}"
-            )
-            
-            portfolio['spy_shares'] = 0
-            portfolio['rsp_shares'] = 0
-            current_position = None
-            bars_in_position = 0
-            portfolio['entry_value'] = 0
-    
-    # Entry logic
-    if current_position is None:
-        position_size = portfolio_value * CAPITAL_USAGE / 2
-        
-        if ratio_rsi > RSI_OVERBOUGHT:
+@numba.njit(cache=True)
+def _simulate(spy_close, rsp_close, rsi, entry_candidates,
+              rsi_ob, rsi_os, cap_use, max_hold, pt, sl):
+    """Run the scalp state machine over the price arrays.
+
+    Entry candidates (bars where RSI is past a threshold) are precomputed
+    as a vectorized mask, so the kernel only walks bars while a position
+    is open and jumps straight from one candidate entry to the next;
+    flat stretches of the equity curve are filled with a slice assign.
+
+    Returns the equity curve plus an event record per trade action:
+    (bar_index, event_code, rsi_or_pnl_pct, size_or_pnl, bars_held).
+    """
+    n = spy_close.size
+    equity = np.empty(n)
+    events = np.empty((2 * n, 5))
+    n_events = 0
+
+    cash = 100000.0
+    next_bar = 0  # first bar whose equity has not been written yet
+
+    for c in range(entry_candidates.size):
+        e = entry_candidates[c]
+        if e < next_bar:
+            # Candidate fell inside the position we just traded through
+            continue
+
+        # Flat from next_bar up to and including the entry bar
+        equity[next_bar:e + 1] = cash
+        next_bar = e + 1
+
+        ratio_rsi = rsi[e]
+        spy_price = spy_close[e]
+        rsp_price = rsp_close[e]
+        entry_value = cash
+        position_size = entry_value * cap_use / 2
+
+        if ratio_rsi > rsi_ob:
             # Short SPY, Long RSP
+            position = 1
             spy_shares = -(position_size // spy_price)
             rsp_shares = position_size // rsp_price
-            
-            portfolio['spy_shares'] = spy_shares
-            portfolio['rsp_shares'] = rsp_shares
-            portfolio['cash'] -= (rsp_shares * rsp_price)
-            portfolio['cash'] += (-spy_shares * spy_price)
-            portfolio['entry_value'] = portfolio_value
-            portfolio['entry_bar'] = bar_count
-            
-            current_position = 'short_spy_long_rsp'
-            bars_in_position = 0
-            
-            portfolio['trades'].append(
-                f"{date}: ENTER SHORT SPY/LONG RSP | RSI={ratio_rsi:.1f} | Size=${position_size*2:,.0f}"
-            )
-            
-        elif ratio_rsi < RSI_OVERSOLD:
+            enter_code = EVENT_ENTER_SHORT_SPY
+        else:
             # Long SPY, Short RSP
+            position = -1
             spy_shares = position_size // spy_price
             rsp_shares = -(position_size // rsp_price)
-            
-            portfolio['spy_shares'] = spy_shares
-            portfolio['rsp_shares'] = rsp_shares
-            portfolio['cash'] -= (spy_shares * spy_price)
-            portfolio['cash'] += (-rsp_shares * rsp_price)
-            portfolio['entry_value'] = portfolio_value
-            portfolio['entry_bar'] = bar_count
-            
-            current_position = 'long_spy_short_rsp'
-            bars_in_position = 0
-            
-            portfolio['trades'].append(
-                f"{date}: ENTER LONG SPY/SHORT RSP | RSI={ratio_rsi:.1f} | Size=${position_size*2:,.0f}"
-            )
+            enter_code = EVENT_ENTER_LONG_SPY
+        cash -= spy_shares * spy_price
+        cash -= rsp_shares * rsp_price
+
+        events[n_events, 0] = e
+        events[n_events, 1] = enter_code
+        events[n_events, 2] = ratio_rsi
+        events[n_events, 3] = position_size
+        events[n_events, 4] = 0
+        n_events += 1
+
+        # Walk forward until an exit triggers (bounded by max_hold)
+        bars_in_position = 0
+        for j in range(e + 1, n):
+            bars_in_position += 1
+            spy_price = spy_close[j]
+            rsp_price = rsp_close[j]
+            ratio_rsi = rsi[j]
+
+            portfolio_value = cash + spy_shares * spy_price + rsp_shares * rsp_price
+            equity[j] = portfolio_value
+            next_bar = j + 1
+
+            position_pnl = portfolio_value - entry_value
+            pnl_pct = position_pnl / entry_value
+
+            exit_code = -1
+            if pnl_pct >= pt:
+                exit_code = EXIT_PROFIT_TARGET
+            elif pnl_pct <= -sl:
+                exit_code = EXIT_STOP_LOSS
+            elif bars_in_position >= max_hold:
+                exit_code = EXIT_TIME_LIMIT
+            elif position == 1 and ratio_rsi < 50:
+                exit_code = EXIT_RSI_REVERSION
+            elif position == -1 and ratio_rsi > 50:
+                exit_code = EXIT_RSI_REVERSION
+
+            if exit_code >= 0:
+                cash += spy_shares * spy_price
+                cash += rsp_shares * rsp_price
+                aux = ratio_rsi if exit_code == EXIT_RSI_REVERSION else pnl_pct
+                events[n_events, 0] = j
+                events[n_events, 1] = exit_code
+                events[n_events, 2] = aux
+                events[n_events, 3] = position_pnl
+                events[n_events, 4] = bars_in_position
+                n_events += 1
+
+                # Allow an immediate re-entry on the exit bar itself
+                next_bar = j
+                break
+
+    # Flat through the end of the data
+    if next_bar < n:
+        equity[next_bar:] = cash
+
+    return equity, events[:n_events]
+
+
+print("\nRunning HYPER-SHORT scalping strategy...")
+print(f"RSI Thresholds: {RSI_OVERBOUGHT}/{RSI_OVERSOLD} (tighter)")
+print(f"Max Hold: {MAX_HOLD_BARS} bars (60 minutes)")
+print(f"Profit Target: {PROFIT_TARGET*100}%")
+print(f"Stop Loss: {STOP_LOSS*100}%")
+print("="*60)
+
+# Hoist columns into NumPy arrays once - label-based .loc lookups inside the
+# loop are O(log n) each and dominate the per-bar cost
+spy_close = df['Close'].to_numpy()
+rsp_close = df['Close_rsp'].to_numpy()
+rsi_arr = df['ratio_rsi'].to_numpy()
+dates = df.index.to_numpy()
+
+def simulate(params):
+    """Backtest one (rsi_ob, rsi_os, profit_target, stop_loss) combination."""
+    rsi_ob, rsi_os, pt, sl = params
+    candidates = np.flatnonzero((rsi_arr > rsi_ob) | (rsi_arr < rsi_os))
+    equity, events = _simulate(
+        spy_close, rsp_close, rsi_arr, candidates,
+        rsi_ob, rsi_os, CAPITAL_USAGE, MAX_HOLD_BARS, pt, sl
+    )
+    return {
+        'rsi_overbought': rsi_ob,
+        'rsi_oversold': rsi_os,
+        'profit_target': pt,
+        'stop_loss': sl,
+        'final_value': float(equity[-1]),
+        'return_pct': (float(equity[-1]) - 100000) / 100000 * 100,
+        'trades': int((events[:, 1] <= EVENT_ENTER_LONG_SPY).sum()),
+    }
+
+
+def sweep(param_grid, processes=None):
+    """Run simulate() over a parameter grid across all cores.
+
+    Workers are forked after the price arrays are built, so the data is
+    shared copy-on-write instead of being re-parsed per process.
+    """
+    with Pool(processes) as pool:
+        return pool.map(simulate, param_grid)
+
+
+# The __main__ guard keeps spawn-based workers (macOS/Windows) from
+# re-entering the sweep when they re-import this module
+if __name__ == '__main__' and os.environ.get('SCALP_SWEEP'):
+    grid = list(product(
+        [60, 65, 70, 75],            # RSI overbought
+        [25, 30, 35, 40],            # RSI oversold
+        [0.004, 0.005, 0.0075],      # profit target
+        [0.002, 0.003, 0.004],       # stop loss
+    ))
+    print(f"\nSweeping {len(grid)} parameter combinations across cores...")
+    sweep_df = pd.DataFrame(sweep(grid)).sort_values('return_pct', ascending=False)
+    print(sweep_df.head(10).to_string(index=False))
+
+# Vectorized entry mask; the kernel skips every flat bar in between
+entry_candidates = np.flatnonzero((rsi_arr > RSI_OVERBOUGHT) | (rsi_arr < RSI_OVERSOLD))
+
+equity_arr, events = _simulate(
+    spy_close, rsp_close, rsi_arr, entry_candidates,
+    RSI_OVERBOUGHT, RSI_OVERSOLD, CAPITAL_USAGE,
+    MAX_HOLD_BARS, PROFIT_TARGET, STOP_LOSS
+)
+
+def format_trade(event):
+    """Render one raw event record as a trade-log line (only at print time)."""
+    bar, code, aux, value, bars_held = event
+    date = dates[int(bar)]
+    code = int(code)
+    if code == EVENT_ENTER_SHORT_SPY:
+        return f"{date}: ENTER SHORT SPY/LONG RSP | RSI={aux:.1f} | Size=${value*2:,.0f}"
+    if code == EVENT_ENTER_LONG_SPY:
+        return f"{date}: ENTER LONG SPY/SHORT RSP | RSI={aux:.1f} | Size=${value*2:,.0f}"
+    if code == EXIT_PROFIT_TARGET:
+        exit_reason = f"PROFIT TARGET ({aux*100:.2f}%)"
+    elif code == EXIT_STOP_LOSS:
+        exit_reason = f"STOP LOSS ({aux*100:.2f}%)"
+    elif code == EXIT_TIME_LIMIT:
+        exit_reason = f"TIME LIMIT ({int(bars_held)} bars)"
+    else:
+        exit_reason = f"RSI REVERSION ({aux:.1f})"
+    return f"{date}: CLOSE | {exit_reason} | Held {int(bars_held)} bars | PnL: ${value:.2f}"
 
 # Results
-final_value = portfolio['equity'][-1]
+final_value = equity_arr[-1]
 total_pnl = final_value - 100000
-entry_trades = len([t for t in portfolio['trades'] if 'ENTER' in t])
-profit_targets = len([t for t in portfolio['trades'] if 'PROFIT TARGET' in t])
-stop_losses = len([t for t in portfolio['trades'] if 'STOP LOSS' in t])
-time_exits = len([t for t in portfolio['trades'] if 'TIME LIMIT' in t])
-rsi_exits = len([t for t in portfolio['trades'] if 'RSI REVERSION' in t])
+# One bincount over the event codes instead of a scan per category
+counts = np.bincount(events[:, 1].astype(np.int64), minlength=EXIT_RSI_REVERSION + 1)
+entry_trades = int(counts[EVENT_ENTER_SHORT_SPY] + counts[EVENT_ENTER_LONG_SPY])
+profit_targets = int(counts[EXIT_PROFIT_TARGET])
+stop_losses = int(counts[EXIT_STOP_LOSS])
+time_exits = int(counts[EXIT_TIME_LIMIT])
+rsi_exits = int(counts[EXIT_RSI_REVERSION])
 
 print("\n" + "="*60)
 print("HYPER-SHORT SCALPING RESULTS")
@@ -202,19 +273,23 @@ print(f"  Max Hold: {MAX_HOLD_BARS} bars (60 min)")
 print(f"  Profit Target: {PROFIT_TARGET*100}%")
 print(f"  Stop Loss: {STOP_LOSS*100}%")
 print("\nLast 30 Trades:")
-for trade in portfolio['trades'][-30:]:
-    print(f"  {trade}")
-
-# Plot
-plt.figure(figsize=(14, 7))
-plt.plot(portfolio['dates'], portfolio['equity'], linewidth=1.5)
-plt.axhline(y=100000, color='r', linestyle='--', label='Starting Capital')
-plt.xlabel('Date')
-plt.ylabel('Portfolio Value ($)')
-plt.title('HYPER-SHORT Scalping Strategy - 60min Max Hold')
-plt.legend()
-plt.grid(True, alpha=0.3)
-plt.tight_layout()
-plt.show()
+for event in events[-30:]:
+    print(f"  {format_trade(event)}")
+
+# Plot - matplotlib is imported lazily so headless runs (NO_PLOT=1, sweep
+# workers, CI) skip its ~300ms backend/font-cache startup cost
+if not os.environ.get('NO_PLOT'):
+    import matplotlib.pyplot as plt
+
+    plt.figure(figsize=(14, 7))
+    plt.plot(dates, equity_arr, linewidth=1.5)
+    plt.axhline(y=100000, color='r', linestyle='--', label='Starting Capital')
+    plt.xlabel('Date')
+    plt.ylabel('Portfolio Value ($)')
+    plt.title('HYPER-SHORT Scalping Strategy - 60min Max Hold')
+    plt.legend()
+    plt.grid(True, alpha=0.3)
+    plt.tight_layout()
+    plt.show()
 
 print("\n" + "="*60)
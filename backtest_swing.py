@@ -3,58 +3,120 @@
 SWING TRADING Strategy - Daily bars, longer holds, stable signals
 """
 
+import os
+from itertools import product
+from multiprocessing import Pool
+
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
+import numba
+
+from pipeline.alpaca import load_or_cache
+
+@numba.njit(cache=True)
+def _compute_features(spy_close, rsp_close, rsi_period, sma_fast, sma_slow, z_window):
+    """Build every ratio indicator in one traversal of the price arrays.
+
+    Computes the SPY/RSP ratio, its Wilder RSI, both SMAs, and the z-score
+    (rolling mean/std with ddof=1) while each bar is still in cache, instead
+    of a separate columnar pass per indicator. Rolling stats use running
+    sums; the RSI uses the usual SMA-seeded Wilder recurrence.
+    """
+    n = spy_close.size
+    ratio = np.empty(n)
+    rsi = np.full(n, np.nan)
+    sma_f = np.full(n, np.nan)
+    sma_s = np.full(n, np.nan)
+    zscore = np.full(n, np.nan)
+
+    sum_f = 0.0
+    sum_s = 0.0
+    z_sum = 0.0
+    z_sum_sq = 0.0
+    avg_gain = 0.0
+    avg_loss = 0.0
 
-def calculate_rsi(prices, period=14):
-    """Calculate RSI indicator"""
-    delta = prices.diff()
-    gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-    rs = gain / loss
-    rsi = 100 - (100 / (1 + rs))
-    return rsi
+    for i in range(n):
+        r = spy_close[i] / rsp_close[i]
+        ratio[i] = r
 
-def calculate_sma(prices, period):
-    """Calculate Simple Moving Average"""
-    return prices.rolling(window=period).mean()
+        sum_f += r
+        if i >= sma_fast:
+            sum_f -= ratio[i - sma_fast]
+        if i >= sma_fast - 1:
+            sma_f[i] = sum_f / sma_fast
+
+        sum_s += r
+        if i >= sma_slow:
+            sum_s -= ratio[i - sma_slow]
+        if i >= sma_slow - 1:
+            sma_s[i] = sum_s / sma_slow
+
+        z_sum += r
+        z_sum_sq += r * r
+        if i >= z_window:
+            old = ratio[i - z_window]
+            z_sum -= old
+            z_sum_sq -= old * old
+        if i >= z_window - 1:
+            m = z_sum / z_window
+            var = (z_sum_sq - z_window * m * m) / (z_window - 1)
+            # A flat window has no defined z-score; leave it NaN (the pandas
+            # rolling-std path produced NaN here, which dropna() removes)
+            if var > 0:
+                zscore[i] = (r - m) / np.sqrt(var)
+
+        if i >= 1:
+            delta = r - ratio[i - 1]
+            gain = delta if delta > 0 else 0.0
+            loss = -delta if delta < 0 else 0.0
+            if i <= rsi_period:
+                avg_gain += gain
+                avg_loss += loss
+                if i == rsi_period:
+                    avg_gain /= rsi_period
+                    avg_loss /= rsi_period
+                else:
+                    continue
+            else:
+                avg_gain = (avg_gain * (rsi_period - 1) + gain) / rsi_period
+                avg_loss = (avg_loss * (rsi_period - 1) + loss) / rsi_period
+            if avg_loss == 0.0:
+                rsi[i] = 100.0
+            else:
+                rsi[i] = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+
+    return ratio, rsi, sma_f, sma_s, zscore
 
 # Load DAILY data
 print("Loading SPY and RSP daily data...")
-spy_df = pd.read_csv('data/SPY_1Day_stock_alpaca_clean.csv', index_col='Datetime', parse_dates=True)
-rsp_df = pd.read_csv('data/RSP_1Day_stock_alpaca_clean.csv', index_col='Datetime', parse_dates=True)
+spy_df = load_or_cache('data/SPY_1Day_stock_alpaca_clean.csv')
+rsp_df = load_or_cache('data/RSP_1Day_stock_alpaca_clean.csv')
 
-# Align dates
-common_dates = spy_df.index.intersection(rsp_df.index)
-spy_df = spy_df.loc[common_dates]
-rsp_df = rsp_df.loc[common_dates]
+# Align dates - one inner join instead of intersection + two label gathers
+df = spy_df[['Close']].join(rsp_df[['Close']], how='inner', rsuffix='_rsp')
 
-print(f"Loaded {len(spy_df)} daily bars")
+print(f"Loaded {len(df)} daily bars")
 
 # Calculate indicators
 print("Calculating swing trading indicators...")
 
-# 1. Price ratio
-spy_df['ratio'] = spy_df['Close'] / rsp_df['Close']
-
-# 2. RSI of ratio (standard 14-day)
-spy_df['ratio_rsi'] = calculate_rsi(spy_df['ratio'], period=14)
-
-# 3. Moving averages of ratio for trend
-spy_df['ratio_sma20'] = calculate_sma(spy_df['ratio'], 20)
-spy_df['ratio_sma50'] = calculate_sma(spy_df['ratio'], 50)
-
-# 4. Z-score of ratio (statistical extremes)
-spy_df['ratio_mean60'] = spy_df['ratio'].rolling(60).mean()
-spy_df['ratio_std60'] = spy_df['ratio'].rolling(60).std()
-spy_df['ratio_zscore'] = (spy_df['ratio'] - spy_df['ratio_mean60']) / spy_df['ratio_std60']
+# Ratio, 14-day Wilder RSI, SMA 20/50, and 60-day z-score in a single
+# fused pass over the price arrays
+ratio, ratio_rsi, ratio_sma20, ratio_sma50, ratio_zscore = _compute_features(
+    df['Close'].to_numpy(np.float64), df['Close_rsp'].to_numpy(np.float64),
+    14, 20, 50, 60
+)
+df['ratio'] = ratio
+df['ratio_rsi'] = ratio_rsi
+df['ratio_sma20'] = ratio_sma20
+df['ratio_sma50'] = ratio_sma50
+df['ratio_zscore'] = ratio_zscore
 
 # Drop NaN
-spy_df = spy_df.dropna()
-rsp_df = rsp_df.loc[spy_df.index]
+df = df.dropna()
 
-print(f"Valid data points: {len(spy_df)}")
+print(f"Valid data points: {len(df)}")
 
 # SWING STRATEGY PARAMETERS
 RSI_OVERBOUGHT = 65
@@ -67,20 +129,127 @@ CAPITAL_USAGE = 0.80   # Use 80% of capital (less aggressive)
 STOP_LOSS = 0.04       # 4% stop loss (wider for swing)
 PROFIT_TARGET = 0.03   # 3% profit target
 
-# Initialize portfolio
-portfolio = {
-    'cash': 100000,
-    'spy_shares': 0,
-    'rsp_shares': 0,
-    'equity': [],
-    'dates': [],
-    'trades': [],
-    'entry_value': 0,
-    'entry_date': None,
-    'days_in_trade': 0
-}
-
-current_position = None
+# Event codes for the trade log - the jitted loop records numbers only,
+# strings are formatted afterwards in Python
+EVENT_ENTER_SHORT_SPY = 0
+EVENT_ENTER_LONG_SPY = 1
+EXIT_PROFIT_TARGET = 2
+EXIT_STOP_LOSS = 3
+EXIT_MAX_HOLD = 4
+EXIT_MEAN_REVERSION = 5
+
+
+@numba.njit(cache=True)
+def _simulate(spy_close, rsp_close, rsi, zscore,
+              rsi_ob, rsi_os, z_high, z_low,
+              min_hold, max_hold, cap_use, pt, sl):
+    """Run the swing state machine over the price/indicator arrays.
+
+    Returns the equity curve plus an event record per trade action:
+    (bar_index, event_code, rsi_or_pnl_pct, zscore_or_pnl, days_held).
+    """
+    n = spy_close.size
+    equity = np.empty(n)
+    events = np.empty((2 * n, 5))
+    n_events = 0
+
+    cash = 100000.0
+    spy_shares = 0.0
+    rsp_shares = 0.0
+    position = 0  # 0 = flat, 1 = short SPY/long RSP, -1 = long SPY/short RSP
+    days_in_trade = 0
+    entry_value = 0.0
+
+    for i in range(n):
+        spy_price = spy_close[i]
+        rsp_price = rsp_close[i]
+        ratio_rsi = rsi[i]
+        ratio_zscore = zscore[i]
+
+        # When flat the marks are zero, so equity is just cash - skip the
+        # share-valuation multiplies on the (majority) flat bars
+        if position == 0:
+            portfolio_value = cash
+        else:
+            portfolio_value = cash + spy_shares * spy_price + rsp_shares * rsp_price
+            days_in_trade += 1
+        equity[i] = portfolio_value
+
+        # Exit logic
+        if position != 0 and entry_value > 0:
+            pnl = portfolio_value - entry_value
+            pnl_pct = pnl / entry_value
+
+            exit_code = -1
+            if pnl_pct >= pt:
+                exit_code = EXIT_PROFIT_TARGET
+            elif pnl_pct <= -sl:
+                exit_code = EXIT_STOP_LOSS
+            elif days_in_trade >= max_hold:
+                exit_code = EXIT_MAX_HOLD
+            elif days_in_trade >= min_hold:
+                if position == 1 and ratio_rsi < 50 and ratio_zscore < 0.5:
+                    exit_code = EXIT_MEAN_REVERSION
+                elif position == -1 and ratio_rsi > 50 and ratio_zscore > -0.5:
+                    exit_code = EXIT_MEAN_REVERSION
+
+            if exit_code >= 0:
+                cash += spy_shares * spy_price
+                cash += rsp_shares * rsp_price
+
+                events[n_events, 0] = i
+                events[n_events, 1] = exit_code
+                events[n_events, 2] = pnl_pct
+                events[n_events, 3] = pnl
+                events[n_events, 4] = days_in_trade
+                n_events += 1
+
+                spy_shares = 0.0
+                rsp_shares = 0.0
+                position = 0
+                entry_value = 0.0
+                days_in_trade = 0
+
+        # Entry logic - only if no position
+        if position == 0:
+            position_size = portfolio_value * cap_use / 2
+
+            # ENTRY CONDITION 1: RSI + Z-score both extreme (short SPY/long RSP)
+            if ratio_rsi > rsi_ob and ratio_zscore > z_high:
+                spy_shares = -(position_size // spy_price)
+                rsp_shares = position_size // rsp_price
+                cash -= rsp_shares * rsp_price
+                cash += -spy_shares * spy_price
+                entry_value = portfolio_value
+                days_in_trade = 0
+                position = 1
+
+                events[n_events, 0] = i
+                events[n_events, 1] = EVENT_ENTER_SHORT_SPY
+                events[n_events, 2] = ratio_rsi
+                events[n_events, 3] = ratio_zscore
+                events[n_events, 4] = 0
+                n_events += 1
+
+            # ENTRY CONDITION 2: RSI + Z-score both extreme (long SPY/short RSP)
+            elif ratio_rsi < rsi_os and ratio_zscore < z_low:
+                spy_shares = position_size // spy_price
+                rsp_shares = -(position_size // rsp_price)
+                cash -= spy_shares * spy_price
+                cash += -rsp_shares * rsp_price
+                entry_value = portfolio_value
+                days_in_trade = 0
+                position = -1
+
+                events[n_events, 0] = i
+                events[n_events, 1] = EVENT_ENTER_LONG_SPY
+                events[n_events, 2] = ratio_rsi
+                events[n_events, 3] = ratio_zscore
+                events[n_events, 4] = 0
+                n_events += 1
+
+    return equity, events[:n_events]
+
 
 print("\nRunning SWING TRADING strategy...")
 print(f"Entry: RSI {RSI_OVERBOUGHT}/{RSI_OVERSOLD} + Z-score ±{ZSCORE_HIGH}")
@@ -89,125 +258,93 @@ print(f"Profit Target: {PROFIT_TARGET*100}%")
 print(f"Stop Loss: {STOP_LOSS*100}%")
 print("="*70)
 
-for date in spy_df.index:
-    spy_price = spy_df.loc[date, 'Close']
-    rsp_price = rsp_df.loc[date, 'Close']
-    ratio_rsi = spy_df.loc[date, 'ratio_rsi']
-    ratio_zscore = spy_df.loc[date, 'ratio_zscore']
-    
-    # Calculate portfolio value
-    portfolio_value = portfolio['cash'] + \
-                      portfolio['spy_shares'] * spy_price + \
-                      portfolio['rsp_shares'] * rsp_price
-    
-    portfolio['equity'].append(portfolio_value)
-    portfolio['dates'].append(date)
-    
-    # Track days in trade
-    if current_position is not None:
-        portfolio['days_in_trade'] += 1
-    
-    # Exit logic
-    if current_position is not None and portfolio['entry_value'] > 0:
-        pnl = portfolio_value - portfolio['entry_value']
-        pnl_pct = pnl / portfolio['entry_value']
-        days_held = portfolio['days_in_trade']
-        
-        should_exit = False
-        exit_reason = ""
-        
-        # 1. Profit target
-        if pnl_pct >= PROFIT_TARGET:
-            should_exit = True
-            exit_reason = f"PROFIT TARGET ({pnl_pct*100:.2f}%)"
-        
-        # 2. Stop loss
-        elif pnl_pct <= -STOP_LOSS:
-            should_exit = True
-            exit_reason = f"STOP LOSS ({pnl_pct*100:.2f}%)"
-        
-        # 3. Max hold reached
-        elif days_held >= MAX_HOLD_DAYS:
-            should_exit = True
-            exit_reason = f"MAX HOLD ({days_held} days)"
-        
-        # 4. Mean reversion complete (after minimum hold)
-        elif days_held >= MIN_HOLD_DAYS:
-            if current_position == 'short_spy_long_rsp':
-                if ratio_rsi < 50 and ratio_zscore < 0.5:
-                    should_exit = True
-                    exit_reason = f"MEAN REVERSION ({days_held} days)"
-            elif current_position == 'long_spy_short_rsp':
-                if ratio_rsi > 50 and ratio_zscore > -0.5:
-                    should_exit = True
-                    exit_reason = f"MEAN REVERSION ({days_held} days)"
-        
-        if should_exit:
-            # Close position
-            portfolio['cash'] += portfolio['spy_shares'] * spy_price
-            portfolio['cash'] += portfolio['rsp_shares'] * rsp_price
-            
-            portfolio['trades'].append(
-                f"{date.date()}: EXIT | {exit_reason} | PnL: ${pnl:.2f} ({pnl_pct*100:.2f}%)"
-            )
-            
-            portfolio['spy_shares'] = 0
-            portfolio['rsp_shares'] = 0
-            current_position = None
-            portfolio['entry_value'] = 0
-            portfolio['entry_date'] = None
-            portfolio['days_in_trade'] = 0
-    
-    # Entry logic - only if no position
-    if current_position is None:
-        position_size = portfolio_value * CAPITAL_USAGE / 2
-        
-        # ENTRY CONDITION 1: RSI + Z-score both extreme (short SPY/long RSP)
-        if ratio_rsi > RSI_OVERBOUGHT and ratio_zscore > ZSCORE_HIGH:
-            spy_shares = -(position_size // spy_price)
-            rsp_shares = position_size // rsp_price
-            
-            portfolio['spy_shares'] = spy_shares
-            portfolio['rsp_shares'] = rsp_shares
-            portfolio['cash'] -= (rsp_shares * rsp_price)
-            portfolio['cash'] += (-spy_shares * spy_price)
-            portfolio['entry_value'] = portfolio_value
-            portfolio['entry_date'] = date
-            portfolio['days_in_trade'] = 0
-            
-            current_position = 'short_spy_long_rsp'
-            
-            portfolio['trades'].append(
-                f"{date.date()}: ENTER SHORT SPY/LONG RSP | RSI={ratio_rsi:.1f}, Z={ratio_zscore:.2f}"
-            )
-        
-        # ENTRY CONDITION 2: RSI + Z-score both extreme (long SPY/short RSP)
-        elif ratio_rsi < RSI_OVERSOLD and ratio_zscore < ZSCORE_LOW:
-            spy_shares = position_size // spy_price
-            rsp_shares = -(position_size // rsp_price)
-            
-            portfolio['spy_shares'] = spy_shares
-            portfolio['rsp_shares'] = rsp_shares
-            portfolio['cash'] -= (spy_shares * spy_price)
-            portfolio['cash'] += (-rsp_shares * rsp_price)
-            portfolio['entry_value'] = portfolio_value
-            portfolio['entry_date'] = date
-            portfolio['days_in_trade'] = 0
-            
-            current_position = 'long_spy_short_rsp'
-            
-            portfolio['trades'].append(
-                f"{date.date()}: ENTER LONG SPY/SHORT RSP | RSI={ratio_rsi:.1f}, Z={ratio_zscore:.2f}"
-            )
+# Hoist columns into NumPy arrays once so the jitted loop sees plain float64
+spy_close = df['Close'].to_numpy()
+rsp_close = df['Close_rsp'].to_numpy()
+rsi_arr = df['ratio_rsi'].to_numpy()
+zscore_arr = df['ratio_zscore'].to_numpy()
+dates = df.index.to_numpy()
+
+def simulate(params):
+    """Backtest one (rsi_ob, rsi_os, z_high, profit_target, stop_loss) combination."""
+    rsi_ob, rsi_os, z_high, pt, sl = params
+    equity, events = _simulate(
+        spy_close, rsp_close, rsi_arr, zscore_arr,
+        rsi_ob, rsi_os, z_high, -z_high,
+        MIN_HOLD_DAYS, MAX_HOLD_DAYS, CAPITAL_USAGE, pt, sl
+    )
+    return {
+        'rsi_overbought': rsi_ob,
+        'rsi_oversold': rsi_os,
+        'zscore': z_high,
+        'profit_target': pt,
+        'stop_loss': sl,
+        'final_value': float(equity[-1]),
+        'return_pct': (float(equity[-1]) - 100000) / 100000 * 100,
+        'trades': int((events[:, 1] <= EVENT_ENTER_LONG_SPY).sum()),
+    }
+
+
+def sweep(param_grid, processes=None):
+    """Run simulate() over a parameter grid across all cores.
+
+    Workers are forked after the indicator arrays are built, so the data
+    is shared copy-on-write instead of being re-parsed per process.
+    """
+    with Pool(processes) as pool:
+        return pool.map(simulate, param_grid)
+
+
+# The __main__ guard keeps spawn-based workers (macOS/Windows) from
+# re-entering the sweep when they re-import this module
+if __name__ == '__main__' and os.environ.get('SWING_SWEEP'):
+    grid = list(product(
+        [60, 65, 70],          # RSI overbought
+        [30, 35, 40],          # RSI oversold
+        [1.0, 1.5, 2.0],       # z-score entry
+        [0.02, 0.03, 0.04],    # profit target
+        [0.03, 0.04, 0.05],    # stop loss
+    ))
+    print(f"\nSweeping {len(grid)} parameter combinations across cores...")
+    sweep_df = pd.DataFrame(sweep(grid)).sort_values('return_pct', ascending=False)
+    print(sweep_df.head(10).to_string(index=False))
+
+equity_arr, events = _simulate(
+    spy_close, rsp_close, rsi_arr, zscore_arr,
+    RSI_OVERBOUGHT, RSI_OVERSOLD, ZSCORE_HIGH, ZSCORE_LOW,
+    MIN_HOLD_DAYS, MAX_HOLD_DAYS, CAPITAL_USAGE,
+    PROFIT_TARGET, STOP_LOSS
+)
+
+def format_trade(event):
+    """Render one raw event record as a trade-log line (only at print time)."""
+    bar, code, a, b, days_held = event
+    date = pd.Timestamp(dates[int(bar)]).date()
+    code = int(code)
+    if code == EVENT_ENTER_SHORT_SPY:
+        return f"{date}: ENTER SHORT SPY/LONG RSP | RSI={a:.1f}, Z={b:.2f}"
+    if code == EVENT_ENTER_LONG_SPY:
+        return f"{date}: ENTER LONG SPY/SHORT RSP | RSI={a:.1f}, Z={b:.2f}"
+    if code == EXIT_PROFIT_TARGET:
+        exit_reason = f"PROFIT TARGET ({a*100:.2f}%)"
+    elif code == EXIT_STOP_LOSS:
+        exit_reason = f"STOP LOSS ({a*100:.2f}%)"
+    elif code == EXIT_MAX_HOLD:
+        exit_reason = f"MAX HOLD ({int(days_held)} days)"
+    else:
+        exit_reason = f"MEAN REVERSION ({int(days_held)} days)"
+    return f"{date}: EXIT | {exit_reason} | PnL: ${b:.2f} ({a*100:.2f}%)"
 
 # Results
-final_value = portfolio['equity'][-1]
+final_value = equity_arr[-1]
 total_pnl = final_value - 100000
-entry_trades = len([t for t in portfolio['trades'] if 'ENTER' in t])
-profit_exits = len([t for t in portfolio['trades'] if 'PROFIT TARGET' in t])
-stop_exits = len([t for t in portfolio['trades'] if 'STOP LOSS' in t])
-time_exits = len([t for t in portfolio['trades'] if 'MAX HOLD' in t])
-mean_rev_exits = len([t for t in portfolio['trades'] if 'MEAN REVERSION' in t])
+# One bincount over the event codes instead of a scan per category
+counts = np.bincount(events[:, 1].astype(np.int64), minlength=EXIT_MEAN_REVERSION + 1)
+entry_trades = int(counts[EVENT_ENTER_SHORT_SPY] + counts[EVENT_ENTER_LONG_SPY])
+profit_exits = int(counts[EXIT_PROFIT_TARGET])
+stop_exits = int(counts[EXIT_STOP_LOSS])
+time_exits = int(counts[EXIT_MAX_HOLD])
+mean_rev_exits = int(counts[EXIT_MEAN_REVERSION])
 
 print("\n" + "="*70)
 print("SWING TRADING RESULTS")
@@ -226,19 +363,23 @@ print(f"\nAverage P&L per trade: ${total_pnl/max(entry_trades,1):.2f}")
 print(f"\nStrategy: Swing (Daily bars, multi-day holds)")
 print(f"Signals: RSI {RSI_OVERBOUGHT}/{RSI_OVERSOLD} + Z-score ±{ZSCORE_HIGH}")
 print("\nAll Trades:")
-for trade in portfolio['trades']:
-    print(f"  {trade}")
-
-# Plot
-plt.figure(figsize=(14, 7))
-plt.plot(portfolio['dates'], portfolio['equity'], linewidth=2)
-plt.axhline(y=100000, color='r', linestyle='--', label='Starting Capital')
-plt.xlabel('Date')
-plt.ylabel('Portfolio Value ($)')
-plt.title('SWING TRADING Strategy - Daily Bars, Multi-Day Holds')
-plt.legend()
-plt.grid(True, alpha=0.3)
-plt.tight_layout()
-plt.show()
+for event in events:
+    print(f"  {format_trade(event)}")
+
+# Plot - matplotlib is imported lazily so headless runs (NO_PLOT=1, sweep
+# workers, CI) skip its ~300ms backend/font-cache startup cost
+if not os.environ.get('NO_PLOT'):
+    import matplotlib.pyplot as plt
+
+    plt.figure(figsize=(14, 7))
+    plt.plot(dates, equity_arr, linewidth=2)
+    plt.axhline(y=100000, color='r', linestyle='--', label='Starting Capital')
+    plt.xlabel('Date')
+    plt.ylabel('Portfolio Value ($)')
+    plt.title('SWING TRADING Strategy - Daily Bars, Multi-Day Holds')
+    plt.legend()
+    plt.grid(True, alpha=0.3)
+    plt.tight_layout()
+    plt.show()
 
 print("\n" + "="*70)
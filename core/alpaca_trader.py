@@ -1,7 +1,10 @@
 from __future__ import annotations
 
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+from functools import lru_cache
 import math
 import os
 from typing import Optional, Tuple
@@ -11,7 +14,7 @@ import pandas as pd
 from alpaca_trade_api.rest import APIError
 
 from core.logger import get_logger, get_trade_logger
-from pipeline.alpaca import fetch_crypto_bars, fetch_stock_bars, get_rest
+from pipeline.alpaca import DEFAULT_BASE_URL, fetch_crypto_bars, fetch_stock_bars, get_rest
 from strategies import Strategy
 
 logger = get_logger("alpaca_trader")
@@ -29,6 +32,23 @@ class TradeDecision:
 CRYPTO_QUOTE_SUFFIXES = ("USDT", "USDC", "USD")
 
 
+def _last_scalar(df: pd.DataFrame, column: str, default: Optional[float]) -> Optional[float]:
+    """Read the final value of `column` as a float scalar, skipping Series creation."""
+    if column not in df.columns:
+        return default
+    value = df[column].iat[-1]
+    if value is None:
+        return default
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return default
+    if math.isnan(value):
+        return default
+    return value
+
+
+@lru_cache(maxsize=256)
 def normalize_crypto_symbols(symbol: str) -> tuple[str, str]:
     sym = symbol.strip().upper()
     if not sym:
@@ -154,26 +174,22 @@ class AlpacaTrader:
         signals_df = self.strategy.run(df)
         if signals_df.empty:
             return None, "strategy returned no rows"
-        latest = signals_df.iloc[-1]
-        signal_value = latest.get("signal", 0)
-        signal = int(signal_value) if pd.notna(signal_value) else 0
-        position_value = latest.get("position", None)
-        position = float(position_value) if pd.notna(position_value) else None
-
-        raw_price = latest.get("Close", 0.0)
-        price = float(raw_price) if pd.notna(raw_price) else 0.0
+        # Column-wise .iat reads return plain floats without materializing the
+        # final row as an object Series.
+        signal = int(_last_scalar(signals_df, "signal", 0.0))
+        position = _last_scalar(signals_df, "position", None)
+
+        price = _last_scalar(signals_df, "Close", 0.0)
         if price <= 0:
             return None, "missing price data"
 
-        limit_value = latest.get("limit_price", None)
-        limit_price = float(limit_value) if pd.notna(limit_value) else None
+        limit_price = _last_scalar(signals_df, "limit_price", None)
         order_type = "limit" if limit_price is not None else "market"
         price_for_qty = limit_price if limit_price is not None else price
         if price_for_qty <= 0:
             return None, "invalid price for sizing"
 
-        qty_value = latest.get("target_qty", 0)
-        qty = float(qty_value) if pd.notna(qty_value) else 0.0
+        qty = _last_scalar(signals_df, "target_qty", 0.0)
         if qty <= 0:
             return None, "target_qty is zero"
         if self.asset_class == "crypto":
@@ -251,8 +267,9 @@ class AlpacaTrader:
         )
         return order.id
 
-    def _print_trade(self, decision: TradeDecision, qty: float, order_id: str) -> None:
-        equity = self._get_equity()
+    def _print_trade(self, decision: TradeDecision, qty: float, order_id: str, equity: Optional[float] = None) -> None:
+        if equity is None:
+            equity = self._get_equity()
         net_pnl = equity - self.starting_equity
         qty_display = self._format_qty(qty)
         print_price = decision.limit_price if decision.order_type == "limit" else decision.price
@@ -282,23 +299,37 @@ class AlpacaTrader:
     def _skip_trade(self, reason: str) -> None:
         logger.debug(f"No trade ({self.display_symbol}): {reason}")
 
-    def run_once(self) -> Optional[pd.DataFrame]:
-        try:
-            df = self.fetch_latest_bars()
-        except ValueError as exc:
-            self._skip_trade(str(exc))
-            return None
+    def run_once(self, bars: Optional[pd.DataFrame] = None) -> Optional[pd.DataFrame]:
+        # Each REST call is a blocking HTTP round-trip that releases the GIL,
+        # so snapshot bars, open orders, position, and account concurrently
+        # instead of paying four sequential round-trips per tick.
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            bars_future = None if bars is not None else pool.submit(self.fetch_latest_bars)
+            orders_future = pool.submit(
+                self.api.list_orders, status="open", symbols=[self.symbol]
+            )
+            position_future = pool.submit(self._get_net_position)
+            equity_future = pool.submit(self._get_equity)
+
+        if bars_future is None:
+            df = bars
+        else:
+            try:
+                df = bars_future.result()
+            except ValueError as exc:
+                self._skip_trade(str(exc))
+                return None
         decision, reason = self._build_decision(df)
         if decision is None:
             if reason:
                 self._skip_trade(reason)
             return df
 
-        if self._has_open_order():
+        if len(orders_future.result()) > 0:
             self._skip_trade("open order already exists")
             return df
 
-        net_position = self._get_net_position()
+        net_position = position_future.result()
         qty, reason = self._adjust_qty_for_position(decision, net_position)
         if qty <= 0:
             if reason:
@@ -314,11 +345,57 @@ class AlpacaTrader:
         except APIError as exc:
             self._skip_trade(f"order rejected: {exc}")
             return df
-        self._print_trade(decision, qty, order_id or "unknown")
+        self._print_trade(decision, qty, order_id or "unknown", equity_future.result())
         return df
 
     def run(self, iterations: int = 1, sleep_seconds: int = 60) -> None:
+        # Sleep toward fixed target times instead of a flat sleep after each
+        # tick, so per-iteration work does not accumulate as schedule drift.
+        start = time.monotonic()
         for i in range(iterations):
             self.run_once()
             if i < iterations - 1:
-                time.sleep(sleep_seconds)
+                target = start + (i + 1) * sleep_seconds
+                delay = target - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+
+    def run_stream(self) -> None:
+        """
+        Trade on bars pushed over the Alpaca websocket instead of polling.
+
+        One REST fetch seeds the rolling window; after that each streamed bar
+        is appended in memory and the strategy is evaluated immediately, so no
+        per-tick history download or polling delay remains. Blocks until
+        interrupted.
+        """
+        from alpaca_trade_api.stream import Stream
+
+        seed = self.fetch_latest_bars()
+        window = deque(seed.to_dict("records"), maxlen=self.lookback)
+
+        async def on_bar(bar) -> None:
+            window.append(
+                {
+                    "Datetime": pd.Timestamp(bar.timestamp, unit="ns", tz="UTC"),
+                    "Open": bar.open,
+                    "High": bar.high,
+                    "Low": bar.low,
+                    "Close": bar.close,
+                    "Volume": bar.volume,
+                }
+            )
+            self.run_once(bars=pd.DataFrame(window))
+
+        stream = Stream(
+            key_id=os.environ.get("ALPACA_API_KEY"),
+            secret_key=os.environ.get("ALPACA_API_SECRET"),
+            base_url=os.environ.get("ALPACA_API_URL", DEFAULT_BASE_URL),
+            data_feed=self.feed or os.environ.get("ALPACA_DATA_FEED", "iex"),
+        )
+        if self.asset_class == "crypto":
+            stream.subscribe_crypto_bars(on_bar, self.data_symbol)
+        else:
+            stream.subscribe_bars(on_bar, self.symbol)
+        logger.info(f"Streaming bars for {self.display_symbol}; Ctrl+C to stop.")
+        stream.run()
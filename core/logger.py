@@ -6,20 +6,63 @@ Logs all trades, signals, and system events to both console and files.
 
 from __future__ import annotations
 
+import atexit
 import csv
 import json
 import logging
+import logging.handlers
 import os
-from datetime import datetime
+import queue
+import threading
+import time
 from pathlib import Path
 from typing import Any, Dict, Optional
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 LOG_DIR = Path("logs")
 TRADE_LOG_FILE = "trades.csv"
 SIGNAL_LOG_FILE = "signals.csv"
 SYSTEM_LOG_FILE = "system.log"
 
 
+_EMPTY_JSON = "{}"
+
+
+def _dumps(obj: Dict[str, Any]) -> str:
+    """Serialize compactly, via orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj, separators=(",", ":"))
+
+
+# (epoch second, formatted prefix) for _utc_timestamp
+_ts_cache = (0, "")
+
+
+def _utc_timestamp() -> str:
+    """ISO-8601 UTC timestamp; the per-second prefix is formatted only once
+    per second, so burst logging skips repeated strftime work."""
+    global _ts_cache
+    now = time.time()
+    sec = int(now)
+    cached_sec, prefix = _ts_cache
+    if sec != cached_sec:
+        prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(sec))
+        _ts_cache = (sec, prefix)
+    return f"{prefix}.{int((now - sec) * 1_000_000):06d}Z"
+
+
+def _to_float(value: Any) -> float:
+    try:
+        return float(value or 0)
+    except (ValueError, TypeError):
+        return 0.0
+
+
 def _ensure_log_dir() -> Path:
     LOG_DIR.mkdir(parents=True, exist_ok=True)
     return LOG_DIR
@@ -42,7 +85,6 @@ def get_logger(name: str = "trading") -> logging.Logger:
         datefmt="%Y-%m-%d %H:%M:%S"
     )
     console_handler.setFormatter(console_format)
-    logger.addHandler(console_handler)
 
     # File handler
     _ensure_log_dir()
@@ -53,7 +95,16 @@ def get_logger(name: str = "trading") -> logging.Logger:
         datefmt="%Y-%m-%d %H:%M:%S"
     )
     file_handler.setFormatter(file_format)
-    logger.addHandler(file_handler)
+
+    # Hand records off through a queue so formatting and disk writes happen
+    # on a background listener thread, not the trading loop.
+    log_queue: queue.Queue = queue.Queue(-1)
+    listener = logging.handlers.QueueListener(
+        log_queue, console_handler, file_handler, respect_handler_level=True
+    )
+    listener.start()
+    atexit.register(listener.stop)
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
 
     return logger
 
@@ -71,6 +122,12 @@ class TradeLogger:
         "order_id", "status", "equity", "net_pnl", "strategy", "notes"
     ]
 
+    # Maximum rows the writer thread coalesces into one write+flush.
+    BATCH_SIZE = 256
+
+    # Rough per-row byte estimate used to size tail reads in get_trades.
+    AVG_ROW_BYTES = 256
+
     def __init__(self, log_dir: Optional[Path] = None):
         self.log_dir = log_dir or LOG_DIR
         self.log_dir.mkdir(parents=True, exist_ok=True)
@@ -79,6 +136,69 @@ class TradeLogger:
         self._init_csv(self.trade_file, self.HEADERS)
         self._init_signal_csv()
 
+        # Executed trades are kept in memory so session summaries never
+        # re-read the CSV; an existing log is loaded once for restarts.
+        self._executed_trades: list = self._load_executed_trades()
+
+        # Keep the log files open with persistent buffered writers instead of
+        # paying an open/write/close syscall triple per logged row.
+        self._trade_fh = open(self.trade_file, "a", newline="", buffering=1 << 16)
+        self._trade_writer = csv.DictWriter(self._trade_fh, fieldnames=self.HEADERS)
+        self._signal_fh = open(self.signal_file, "a", newline="", buffering=1 << 16)
+        self._signal_writer = csv.writer(self._signal_fh)
+
+        # Log calls only enqueue; a daemon thread drains the queue in batches
+        # so CSV encoding and disk writes stay off the trading hot path.
+        self._queue: queue.Queue = queue.Queue()
+        self._writer_thread = threading.Thread(
+            target=self._drain_loop, daemon=True, name="trade-logger-writer"
+        )
+        self._writer_thread.start()
+        atexit.register(self.close)
+
+    def _load_executed_trades(self) -> list:
+        if not self.trade_file.exists():
+            return []
+        with open(self.trade_file, "r", newline="") as f:
+            return [
+                row for row in csv.DictReader(f)
+                if row.get("status") not in ("skipped", "rejected", "none")
+            ]
+
+    def _drain_loop(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            try:
+                while len(batch) < self.BATCH_SIZE:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                pass
+            try:
+                for kind, row in batch:
+                    if kind == "trade":
+                        self._trade_writer.writerow(row)
+                    else:
+                        self._signal_writer.writerow(row)
+                self._trade_fh.flush()
+                self._signal_fh.flush()
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def flush(self) -> None:
+        """Block until every queued row has been written to disk."""
+        self._queue.join()
+        self._trade_fh.flush()
+        self._signal_fh.flush()
+
+    def close(self) -> None:
+        """Flush pending rows and close the log files."""
+        if self._trade_fh.closed:
+            return
+        self.flush()
+        self._trade_fh.close()
+        self._signal_fh.close()
+
     def _init_csv(self, filepath: Path, headers: list) -> None:
         if not filepath.exists():
             with open(filepath, "w", newline="") as f:
@@ -104,7 +224,7 @@ class TradeLogger:
         notes: Optional[str] = None,
     ) -> Dict[str, Any]:
         """Log a trade to CSV and return the trade record."""
-        timestamp = datetime.utcnow().isoformat() + "Z"
+        timestamp = _utc_timestamp()
 
         record = {
             "timestamp": timestamp,
@@ -121,9 +241,9 @@ class TradeLogger:
             "notes": notes or "",
         }
 
-        with open(self.trade_file, "a", newline="") as f:
-            writer = csv.DictWriter(f, fieldnames=self.HEADERS)
-            writer.writerow(record)
+        self._queue.put(("trade", record))
+        if status not in ("skipped", "rejected", "none"):
+            self._executed_trades.append(record)
 
         return record
 
@@ -136,18 +256,16 @@ class TradeLogger:
         indicators: Optional[Dict[str, float]] = None,
     ) -> None:
         """Log a trading signal to CSV."""
-        timestamp = datetime.utcnow().isoformat() + "Z"
-
-        with open(self.signal_file, "a", newline="") as f:
-            writer = csv.writer(f)
-            writer.writerow([
-                timestamp,
-                symbol,
-                signal,
-                price,
-                strategy,
-                json.dumps(indicators or {}),
-            ])
+        timestamp = _utc_timestamp()
+
+        self._queue.put(("signal", [
+            timestamp,
+            symbol,
+            signal,
+            price,
+            strategy,
+            _EMPTY_JSON if not indicators else _dumps(indicators),
+        ]))
 
     def log_skip(
         self,
@@ -170,12 +288,20 @@ class TradeLogger:
         """Read recent trades from the log file."""
         if not self.trade_file.exists():
             return []
-
-        trades = []
-        with open(self.trade_file, "r") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                trades.append(row)
+        self.flush()
+
+        with open(self.trade_file, "r", newline="") as f:
+            if limit:
+                # Tail query: seek near the end (with headroom for long rows)
+                # and parse only that slice instead of the whole file.
+                size = os.fstat(f.fileno()).st_size
+                headroom = limit * self.AVG_ROW_BYTES * 2
+                if size > headroom:
+                    f.seek(size - headroom)
+                    f.readline()  # discard the partial line landed in
+                    reader = csv.DictReader(f, fieldnames=self.HEADERS)
+                    return list(reader)[-limit:]
+            trades = list(csv.DictReader(f))
 
         if limit:
             trades = trades[-limit:]
@@ -185,8 +311,6 @@ class TradeLogger:
         """Generate a comprehensive summary of the current trading session."""
         import numpy as np
 
-        trades = self.get_trades()
-
         empty_result = {
             "total_trades": 0,
             "buys": 0,
@@ -203,10 +327,7 @@ class TradeLogger:
             "avg_trade_pnl": 0.0,
         }
 
-        if not trades:
-            return empty_result
-
-        executed_trades = [t for t in trades if t["status"] not in ("skipped", "rejected", "none")]
+        executed_trades = self._executed_trades
 
         if not executed_trades:
             return empty_result
@@ -215,26 +336,24 @@ class TradeLogger:
         buys = sum(1 for t in executed_trades if t["side"] == "buy")
         sells = sum(1 for t in executed_trades if t["side"] == "sell")
 
-        # Extract equity values for performance calculation
-        equities = []
-        for t in executed_trades:
-            try:
-                eq = float(t.get("equity", 0) or 0)
-                if eq > 0:
-                    equities.append(eq)
-            except (ValueError, TypeError):
-                pass
+        # Extract equity values for performance calculation - one vectorized
+        # pass instead of a per-row Python loop with try/except
+        equities = np.fromiter(
+            (_to_float(t.get("equity", 0)) for t in executed_trades),
+            dtype=np.float64,
+            count=len(executed_trades),
+        )
+        equities = equities[equities > 0]
 
-        if not equities:
-            equities = [start_equity]
+        if equities.size == 0:
+            equities = np.array([start_equity])
 
-        end_equity = equities[-1] if equities else start_equity
+        end_equity = float(equities[-1])
         net_pnl = end_equity - start_equity
 
         # Calculate returns from equity curve
-        if len(equities) >= 2:
-            equity_arr = np.array(equities)
-            returns = np.diff(equity_arr) / equity_arr[:-1]
+        if equities.size >= 2:
+            returns = np.diff(equities) / equities[:-1]
             returns = returns[np.isfinite(returns)]  # Remove inf/nan
 
             if len(returns) > 0:
@@ -263,32 +382,20 @@ class TradeLogger:
             sharpe_ratio = 0.0
             max_drawdown = 0.0
 
-        # Count wins/losses based on P&L changes
-        wins = 0
-        losses = 0
-        trade_pnls = []
-
-        for i, t in enumerate(executed_trades):
-            try:
-                pnl = float(t.get("net_pnl", 0) or 0)
-                # For the first trade, compare to 0; for subsequent, compare to previous
-                if i > 0:
-                    prev_pnl = float(executed_trades[i-1].get("net_pnl", 0) or 0)
-                    trade_pnl = pnl - prev_pnl
-                else:
-                    trade_pnl = pnl
-
-                trade_pnls.append(trade_pnl)
-                if trade_pnl > 0:
-                    wins += 1
-                elif trade_pnl < 0:
-                    losses += 1
-            except (ValueError, TypeError):
-                pass
+        # Count wins/losses based on P&L changes - per-trade pnl is the diff
+        # of the cumulative net_pnl column, with the first trade against 0
+        pnls = np.fromiter(
+            (_to_float(t.get("net_pnl", 0)) for t in executed_trades),
+            dtype=np.float64,
+            count=len(executed_trades),
+        )
+        trade_pnls = np.diff(pnls, prepend=0.0)
+        wins = int((trade_pnls > 0).sum())
+        losses = int((trade_pnls < 0).sum())
 
         total_with_outcome = wins + losses
         win_rate = (wins / total_with_outcome * 100) if total_with_outcome > 0 else 0.0
-        avg_trade_pnl = float(np.mean(trade_pnls)) if trade_pnls else 0.0
+        avg_trade_pnl = float(trade_pnls.mean()) if trade_pnls.size else 0.0
 
         return {
             "total_trades": len(executed_trades),
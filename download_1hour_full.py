@@ -1,4 +1,6 @@
 #!/usr/bin/env python3
+from concurrent.futures import ThreadPoolExecutor
+
 import pandas as pd
 from pipeline.alpaca import get_rest, save_bars, clean_market_data, _parse_timeframe, _normalize_bars, _to_rfc3339
 
@@ -9,16 +11,26 @@ timeframe = "1Hour"
 
 print(f"Downloading {timeframe} data from {start.date()} to {end.date()}")
 
-print(f"\nDownloading SPY {timeframe}...")
-spy_bars = api.get_bars("SPY", _parse_timeframe(timeframe), start=_to_rfc3339(start), end=_to_rfc3339(end), limit=10000, feed="iex").df
+
+def download(symbol):
+    return api.get_bars(symbol, _parse_timeframe(timeframe), start=_to_rfc3339(start), end=_to_rfc3339(end), limit=10000, feed="iex").df
+
+
+# The two downloads are independent I/O waits - run them concurrently, then
+# do the cheap normalize/save/clean work per symbol
+print("\nDownloading SPY and RSP in parallel...")
+with ThreadPoolExecutor(max_workers=2) as pool:
+    spy_future = pool.submit(download, "SPY")
+    rsp_future = pool.submit(download, "RSP")
+    spy_bars = spy_future.result()
+    rsp_bars = rsp_future.result()
+
 spy_df = _normalize_bars(spy_bars, "SPY")
 print(f"Got {len(spy_df)} SPY bars")
 spy_raw = save_bars(spy_df, "SPY", timeframe, "stock")
 spy_clean = clean_market_data(spy_raw)
 print(f"Saved to: {spy_clean}")
 
-print(f"\nDownloading RSP {timeframe}...")
-rsp_bars = api.get_bars("RSP", _parse_timeframe(timeframe), start=_to_rfc3339(start), end=_to_rfc3339(end), limit=10000, feed="iex").df
 rsp_df = _normalize_bars(rsp_bars, "RSP")
 print(f"Got {len(rsp_df)} RSP bars")
 rsp_raw = save_bars(rsp_df, "RSP", timeframe, "stock")
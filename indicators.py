@@ -0,0 +1,46 @@
+"""
+Shared technical indicators, JIT-compiled with Numba.
+"""
+
+import numba
+import numpy as np
+import pandas as pd
+
+
+@numba.njit(cache=True)
+def rsi_wilder(prices, period):
+    """Single-pass Wilder RSI (EWM with alpha=1/period, seeded with an SMA)."""
+    n = prices.size
+    out = np.full(n, np.nan)
+    if n <= period:
+        return out
+
+    avg_gain = 0.0
+    avg_loss = 0.0
+    for i in range(1, period + 1):
+        delta = prices[i] - prices[i - 1]
+        if delta > 0:
+            avg_gain += delta
+        else:
+            avg_loss -= delta
+    avg_gain /= period
+    avg_loss /= period
+
+    for i in range(period, n):
+        if i > period:
+            delta = prices[i] - prices[i - 1]
+            gain = delta if delta > 0 else 0.0
+            loss = -delta if delta < 0 else 0.0
+            avg_gain = (avg_gain * (period - 1) + gain) / period
+            avg_loss = (avg_loss * (period - 1) + loss) / period
+        if avg_loss == 0.0:
+            out[i] = 100.0
+        else:
+            out[i] = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+    return out
+
+
+def calculate_rsi(prices, period=14):
+    """Calculate RSI indicator (Wilder smoothing, matches TA-Lib/TradingView)"""
+    values = rsi_wilder(prices.to_numpy(np.float64), period)
+    return pd.Series(values, index=prices.index)
@@ -4,198 +4,240 @@ Parameter Optimization for SPY/RSP Pair Strategy
 Tests multiple parameter combinations to find best settings
 """
 
+import hashlib
+
 import pandas as pd
 import numpy as np
+import numba
 from itertools import product
+from multiprocessing import Pool
 
-def calculate_rsi(prices, period=14):
-    """Calculate RSI indicator"""
-    delta = prices.diff()
-    gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-    rs = gain / loss
-    rsi = 100 - (100 / (1 + rs))
-    return rsi
-
-def backtest_parameters(spy_df, rsp_df, rsi_high, rsi_low, exit_rsi, capital_usage, stop_loss):
-    """Run backtest with given parameters"""
-    
-    # Calculate ratio and RSI
-    df = spy_df.copy()
-    df['rsp_close'] = rsp_df['Close']
-    df['ratio'] = df['Close'] / df['rsp_close']
-    df['ratio_rsi'] = calculate_rsi(df['ratio'], period=14)
-    df = df.dropna()
-    
-    # Initialize
-    portfolio = {
-        'cash': 100000,
-        'spy_shares': 0,
-        'rsp_shares': 0,
-        'equity': 100000,
-        'entry_value': 0
-    }
-    
-    current_position = None
+from joblib import Memory
+
+from indicators import rsi_wilder
+from pipeline.alpaca import load_or_cache
+
+# Results persist across optimizer runs keyed by data hash + parameters,
+# so re-running during exploration only pays for new combinations.
+memory = Memory(".cache/optimize", verbose=0)
+
+@numba.njit(cache=True)
+def _backtest(spy_close, rsp_close, ratio_rsi, rsi_high, rsi_low, exit_rsi, capital_usage, stop_loss):
+    """Tight state-machine loop over plain float64 arrays (JIT-compiled).
+
+    Same trading rules as the old iterrows() loop: stop loss first (skips
+    re-entry on that bar), then RSI exit, then RSI entry when flat.
+    Combinations that draw down past 30% of starting capital abort early
+    and report the equity at the abort bar. Returns (final_value, trades).
+    """
+    cash = 100000.0
+    spy_shares = 0.0
+    rsp_shares = 0.0
+    equity = 100000.0
+    entry_value = 0.0
+    position = 0  # 0 = flat, 1 = short SPY/long RSP, -1 = long SPY/short RSP
     trades = 0
-    
-    for idx, row in df.iterrows():
-        spy_price = row['Close']
-        rsp_price = row['rsp_close']
-        ratio_rsi = row['ratio_rsi']
-        
-        # Calculate portfolio value
-        portfolio_value = portfolio['cash'] + \
-                          portfolio['spy_shares'] * spy_price + \
-                          portfolio['rsp_shares'] * rsp_price
-        portfolio['equity'] = portfolio_value
-        
+
+    for i in range(spy_close.size):
+        spy_price = spy_close[i]
+        rsp_price = rsp_close[i]
+        rsi = ratio_rsi[i]
+
+        portfolio_value = cash + spy_shares * spy_price + rsp_shares * rsp_price
+        equity = portfolio_value
+
+        # Prune hopeless combinations early: once 30% of the capital is gone
+        # this combination cannot rank, so stop paying for the remaining bars
+        if portfolio_value < 70000.0:
+            break
+
         # Check stop loss
-        if current_position is not None and portfolio['entry_value'] > 0:
-            pnl_pct = (portfolio_value - portfolio['entry_value']) / portfolio['entry_value']
+        if position != 0 and entry_value > 0:
+            pnl_pct = (portfolio_value - entry_value) / entry_value
             if pnl_pct <= -stop_loss:
-                # Stop loss hit - close position
-                portfolio['cash'] += portfolio['spy_shares'] * spy_price
-                portfolio['cash'] += portfolio['rsp_shares'] * rsp_price
-                portfolio['spy_shares'] = 0
-                portfolio['rsp_shares'] = 0
-                current_position = None
-                portfolio['entry_value'] = 0
+                cash += spy_shares * spy_price
+                cash += rsp_shares * rsp_price
+                spy_shares = 0.0
+                rsp_shares = 0.0
+                position = 0
+                entry_value = 0.0
                 continue
-        
+
         # Exit logic
-        if current_position is not None:
+        if position != 0:
             should_exit = False
-            
-            if current_position == 'short_spy_long_rsp' and ratio_rsi < exit_rsi:
+            if position == 1 and rsi < exit_rsi:
                 should_exit = True
-            elif current_position == 'long_spy_short_rsp' and ratio_rsi > (100 - exit_rsi):
+            elif position == -1 and rsi > 100.0 - exit_rsi:
                 should_exit = True
-            
             if should_exit:
-                portfolio['cash'] += portfolio['spy_shares'] * spy_price
-                portfolio['cash'] += portfolio['rsp_shares'] * rsp_price
-                portfolio['spy_shares'] = 0
-                portfolio['rsp_shares'] = 0
-                current_position = None
-                portfolio['entry_value'] = 0
-        
+                cash += spy_shares * spy_price
+                cash += rsp_shares * rsp_price
+                spy_shares = 0.0
+                rsp_shares = 0.0
+                position = 0
+                entry_value = 0.0
+
         # Entry logic
-        if current_position is None:
+        if position == 0:
             position_size = portfolio_value * capital_usage / 2
-            
-            if ratio_rsi > rsi_high:
+
+            if rsi > rsi_high:
                 # Short SPY, Long RSP
                 spy_shares = -(position_size // spy_price)
                 rsp_shares = position_size // rsp_price
-                
-                portfolio['spy_shares'] = spy_shares
-                portfolio['rsp_shares'] = rsp_shares
-                portfolio['cash'] -= (rsp_shares * rsp_price)
-                portfolio['cash'] += (-spy_shares * spy_price)
-                portfolio['entry_value'] = portfolio_value
-                current_position = 'short_spy_long_rsp'
+                cash -= rsp_shares * rsp_price
+                cash += -spy_shares * spy_price
+                entry_value = portfolio_value
+                position = 1
                 trades += 1
-                
-            elif ratio_rsi < rsi_low:
+
+            elif rsi < rsi_low:
                 # Long SPY, Short RSP
                 spy_shares = position_size // spy_price
                 rsp_shares = -(position_size // rsp_price)
-                
-                portfolio['spy_shares'] = spy_shares
-                portfolio['rsp_shares'] = rsp_shares
-                portfolio['cash'] -= (spy_shares * spy_price)
-                portfolio['cash'] += (-rsp_shares * rsp_price)
-                portfolio['entry_value'] = portfolio_value
-                current_position = 'long_spy_short_rsp'
+                cash -= spy_shares * spy_price
+                cash += -rsp_shares * rsp_price
+                entry_value = portfolio_value
+                position = -1
                 trades += 1
-    
-    # Final results
-    final_value = portfolio['equity']
+
+    return equity, trades
+
+
+def backtest_parameters(spy_close, rsp_close, ratio_rsi, rsi_high, rsi_low, exit_rsi, capital_usage, stop_loss):
+    """Run backtest with given parameters over precomputed price/RSI arrays"""
+
+    final_value, trades = _backtest(
+        spy_close, rsp_close, ratio_rsi,
+        rsi_high, rsi_low, exit_rsi, capital_usage, stop_loss,
+    )
     total_return = (final_value - 100000) / 100000
-    
+
     return {
         'final_value': final_value,
         'return_pct': total_return * 100,
         'trades': trades
     }
 
-# Load data
-print("Loading SPY and RSP 1-hour data...")
-spy_df = pd.read_csv('data/SPY_1Hour_stock_alpaca_clean.csv', index_col='Datetime', parse_dates=True)
-rsp_df = pd.read_csv('data/RSP_1Hour_stock_alpaca_clean.csv', index_col='Datetime', parse_dates=True)
-
-# Align
-common_dates = spy_df.index.intersection(rsp_df.index)
-spy_df = spy_df.loc[common_dates]
-rsp_df = rsp_df.loc[common_dates]
-
-print(f"Testing on {len(spy_df)} bars (2024-2025)")
-print("\nOptimizing parameters...")
-print("="*80)
-
-# Parameter ranges to test
-rsi_highs = [65, 70, 75, 80]           # Overbought thresholds
-rsi_lows = [20, 25, 30, 35]            # Oversold thresholds
-exit_rsis = [45, 50, 55]                # Exit at this RSI level
-capital_usages = [0.50, 0.70, 0.90]    # % of capital per trade
-stop_losses = [0.01, 0.02, 0.03]       # Stop loss %
-
-# Store results
-results = []
-
-total_combinations = len(list(product(rsi_highs, rsi_lows, exit_rsis, capital_usages, stop_losses)))
-print(f"Testing {total_combinations} parameter combinations...\n")
-
-count = 0
-for rsi_high, rsi_low, exit_rsi, capital_usage, stop_loss in product(rsi_highs, rsi_lows, exit_rsis, capital_usages, stop_losses):
-    count += 1
-    
-    result = backtest_parameters(spy_df, rsp_df, rsi_high, rsi_low, exit_rsi, capital_usage, stop_loss)
-    
-    results.append({
-        'rsi_high': rsi_high,
-        'rsi_low': rsi_low,
-        'exit_rsi': exit_rsi,
-        'capital_usage': capital_usage,
-        'stop_loss': stop_loss,
-        'return': result['return_pct'],
-        'trades': result['trades'],
-        'final_value': result['final_value']
-    })
-    
-    if count % 50 == 0:
-        print(f"Progress: {count}/{total_combinations} tested...")
-
-# Convert to DataFrame and sort by return
-results_df = pd.DataFrame(results)
-results_df = results_df.sort_values('return', ascending=False)
-
-print("\n" + "="*80)
-print("TOP 10 PARAMETER COMBINATIONS")
-print("="*80)
-print(results_df.head(10).to_string(index=False))
-
-print("\n" + "="*80)
-print("BOTTOM 10 PARAMETER COMBINATIONS")
-print("="*80)
-print(results_df.tail(10).to_string(index=False))
-
-# Save results
-results_df.to_csv('optimization_results.csv', index=False)
-print(f"\n✅ Full results saved to: optimization_results.csv")
-
-# Best parameters
-best = results_df.iloc[0]
-print("\n" + "="*80)
-print("BEST PARAMETERS FOUND:")
-print("="*80)
-print(f"RSI Overbought: {best['rsi_high']}")
-print(f"RSI Oversold: {best['rsi_low']}")
-print(f"Exit RSI: {best['exit_rsi']}")
-print(f"Capital Usage: {best['capital_usage']*100}%")
-print(f"Stop Loss: {best['stop_loss']*100}%")
-print(f"Return: {best['return']:.2f}%")
-print(f"Trades: {int(best['trades'])}")
-print(f"Final Value: ${best['final_value']:,.2f}")
-print("="*80)
+
+@memory.cache(ignore=["spy_close", "rsp_close", "ratio_rsi"])
+def backtest_cached(data_hash, rsi_high, rsi_low, exit_rsi, capital_usage, stop_loss,
+                    spy_close=None, rsp_close=None, ratio_rsi=None):
+    """Disk-memoized backtest; the arrays are keyed by their content hash."""
+    return backtest_parameters(spy_close, rsp_close, ratio_rsi, rsi_high, rsi_low, exit_rsi, capital_usage, stop_loss)
+
+
+def run_combination(params):
+    """Backtest one swept combination against the shared indicator arrays.
+
+    Workers are forked after the arrays are built, so they read the data
+    copy-on-write instead of re-parsing or pickling it.
+    """
+    rsi_high, rsi_low, exit_rsi, capital_usage, stop_loss = params
+    result = backtest_cached(data_hash, rsi_high, rsi_low, exit_rsi, capital_usage, stop_loss,
+                             spy_close=spy_close, rsp_close=rsp_close, ratio_rsi=ratio_rsi)
+    return (
+        rsi_high,
+        rsi_low,
+        exit_rsi,
+        capital_usage,
+        stop_loss,
+        result['return_pct'],
+        result['trades'],
+        result['final_value'],
+    )
+
+
+# One row per swept combination, filled in place - avoids a dict per combo
+# and lets pandas adopt the columns without another copy
+RESULT_DTYPE = np.dtype([
+    ('rsi_high', 'i4'), ('rsi_low', 'i4'), ('exit_rsi', 'i4'),
+    ('capital_usage', 'f8'), ('stop_loss', 'f8'),
+    ('return', 'f8'), ('trades', 'i4'), ('final_value', 'f8'),
+])
+
+# The __main__ guard keeps spawn-based workers (macOS/Windows) from
+# re-running the data load and sweep when they re-import this module.
+# The shared arrays are still plain module globals, assigned before the
+# pool is created, so forked workers read them copy-on-write as before.
+if __name__ == '__main__':
+    # Load data
+    print("Loading SPY and RSP 1-hour data...")
+    spy_df = load_or_cache('data/SPY_1Hour_stock_alpaca_clean.csv')
+    rsp_df = load_or_cache('data/RSP_1Hour_stock_alpaca_clean.csv')
+
+    # Align
+    # align walks the two sorted DatetimeIndexes once instead of a hash
+    # intersection followed by two label-based gathers
+    spy_df, rsp_df = spy_df.align(rsp_df, join='inner', axis=0)
+
+    print(f"Testing on {len(spy_df)} bars (2024-2025)")
+    print("\nOptimizing parameters...")
+    print("="*80)
+
+    # The RSI period is fixed at 14, so the ratio and its RSI are identical for
+    # every swept combination - compute them once, straight into float64 arrays
+    # (no DataFrame copy), and mask off the RSI warm-up NaNs
+    spy_close = spy_df['Close'].to_numpy(np.float64)
+    rsp_close = rsp_df['Close'].to_numpy(np.float64)
+    ratio_rsi = rsi_wilder(spy_close / rsp_close, 14)
+    valid = ~np.isnan(ratio_rsi)
+    spy_close = spy_close[valid]
+    rsp_close = rsp_close[valid]
+    ratio_rsi = ratio_rsi[valid]
+    data_hash = hashlib.blake2b(
+        spy_close.tobytes() + rsp_close.tobytes(), digest_size=16
+    ).hexdigest()
+
+    # Parameter ranges to test
+    rsi_highs = [65, 70, 75, 80]           # Overbought thresholds
+    rsi_lows = [20, 25, 30, 35]            # Oversold thresholds
+    exit_rsis = [45, 50, 55]                # Exit at this RSI level
+    capital_usages = [0.50, 0.70, 0.90]    # % of capital per trade
+    stop_losses = [0.01, 0.02, 0.03]       # Stop loss %
+
+    # Run every combination across all cores - each backtest is independent
+    param_grid = list(product(rsi_highs, rsi_lows, exit_rsis, capital_usages, stop_losses))
+    total_combinations = len(param_grid)
+    print(f"Testing {total_combinations} parameter combinations...\n")
+
+    results = np.empty(total_combinations, dtype=RESULT_DTYPE)
+    with Pool() as pool:
+        for count, row in enumerate(pool.imap(run_combination, param_grid, chunksize=16), start=1):
+            results[count - 1] = row
+            if count % 50 == 0:
+                print(f"Progress: {count}/{total_combinations} tested...")
+
+    # Convert to DataFrame and sort by return
+    results_df = pd.DataFrame(results)
+    results_df = results_df.sort_values('return', ascending=False)
+
+    print("\n" + "="*80)
+    print("TOP 10 PARAMETER COMBINATIONS")
+    print("="*80)
+    print(results_df.head(10).to_string(index=False))
+
+    print("\n" + "="*80)
+    print("BOTTOM 10 PARAMETER COMBINATIONS")
+    print("="*80)
+    print(results_df.tail(10).to_string(index=False))
+
+    # Save results
+    results_df.to_csv('optimization_results.csv', index=False)
+    print(f"\n✅ Full results saved to: optimization_results.csv")
+
+    # Best parameters
+    best = results_df.iloc[0]
+    print("\n" + "="*80)
+    print("BEST PARAMETERS FOUND:")
+    print("="*80)
+    print(f"RSI Overbought: {best['rsi_high']}")
+    print(f"RSI Oversold: {best['rsi_low']}")
+    print(f"Exit RSI: {best['exit_rsi']}")
+    print(f"Capital Usage: {best['capital_usage']*100}%")
+    print(f"Stop Loss: {best['stop_loss']*100}%")
+    print(f"Return: {best['return']:.2f}%")
+    print(f"Trades: {int(best['trades'])}")
+    print(f"Final Value: ${best['final_value']:,.2f}")
+    print("="*80)
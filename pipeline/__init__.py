@@ -6,6 +6,7 @@ from .alpaca import (
     fetch_crypto_bars,
     fetch_stock_bars,
     get_rest,
+    load_or_cache,
     save_bars,
 )
 
@@ -16,4 +17,5 @@ __all__ = [
     "fetch_crypto_bars",
     "save_bars",
     "clean_market_data",
+    "load_or_cache",
 ]
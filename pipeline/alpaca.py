@@ -11,6 +11,7 @@ from typing import Optional
 
 import alpaca_trade_api as tradeapi
 import pandas as pd
+import requests
 from dotenv import load_dotenv
 
 
@@ -60,14 +61,34 @@ def _to_rfc3339(ts: pd.Timestamp) -> str:
     return dt.replace(microsecond=0).isoformat().replace("+00:00", "Z")
 
 
+_rest_client: Optional[tradeapi.REST] = None
+
+
 def get_rest() -> tradeapi.REST:
+    """
+    Return a shared REST client for this process.
+
+    Reusing one client keeps the underlying HTTPS connections (and their TLS
+    handshakes) alive across calls, which matters when several traders poll
+    Alpaca from the same process.
+    """
+    global _rest_client
+    if _rest_client is not None:
+        return _rest_client
     _load_env()
     api_key = _require_env("ALPACA_API_KEY")
     api_secret = _require_env("ALPACA_API_SECRET")
     base_url = os.environ.get("ALPACA_API_URL", DEFAULT_BASE_URL).rstrip("/")
     if not base_url:
         base_url = DEFAULT_BASE_URL
-    return tradeapi.REST(api_key, api_secret, base_url, api_version="v2")
+    api = tradeapi.REST(api_key, api_secret, base_url, api_version="v2")
+    session = getattr(api, "_session", None)
+    if isinstance(session, requests.Session):
+        adapter = requests.adapters.HTTPAdapter(pool_connections=32, pool_maxsize=32)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+    _rest_client = api
+    return api
 
 
 def _normalize_bars(df: pd.DataFrame, symbol: str) -> pd.DataFrame:
@@ -194,6 +215,23 @@ def save_bars(df: pd.DataFrame, symbol: str, timeframe: str, asset_class: str) -
     return raw_path
 
 
+def load_or_cache(csv_path: Path) -> pd.DataFrame:
+    """
+    Load a cleaned CSV of bars, keeping a Parquet copy next to it.
+
+    The first call parses the CSV and writes `<name>.parquet`; later calls
+    read the Parquet file, which is much faster for numeric OHLCV columns.
+    The cache is refreshed whenever the CSV is newer than the Parquet copy.
+    """
+    csv_path = Path(csv_path)
+    parquet_path = csv_path.with_suffix(".parquet")
+    if parquet_path.exists() and parquet_path.stat().st_mtime >= csv_path.stat().st_mtime:
+        return pd.read_parquet(parquet_path)
+    df = pd.read_csv(csv_path, index_col="Datetime", parse_dates=True, engine="pyarrow")
+    df.to_parquet(parquet_path)
+    return df
+
+
 def clean_market_data(
     csv_path: Path,
     dest_dir: Optional[Path] = None,
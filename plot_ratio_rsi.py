@@ -3,27 +3,56 @@
 Plot SPY/RSP Price Ratio and its RSI
 """
 
-import pandas as pd
+import numpy as np
 import matplotlib.pyplot as plt
 
-def calculate_rsi(prices, period=14):
-    """Calculate RSI indicator"""
-    delta = prices.diff()
-    gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-    rs = gain / loss
-    rsi = 100 - (100 / (1 + rs))
-    return rsi
+from indicators import calculate_rsi
+from pipeline.alpaca import load_or_cache
+
+# Cap on points handed to matplotlib - more than this exceeds screen
+# resolution and only slows rendering and pan/zoom
+MAX_PLOT_POINTS = 4000
+
+
+def lttb_indices(x, y, n_out):
+    """Largest-Triangle-Three-Buckets downsampling; returns kept indices.
+
+    Keeps the first and last points and, per bucket, the point forming the
+    largest triangle with the previously kept point and the next bucket's
+    average - preserving visual shape far better than plain striding.
+    """
+    n = y.size
+    if n <= n_out:
+        return np.arange(n)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    prev = 0
+    for i in range(n_out - 2):
+        lo = edges[i]
+        hi = max(edges[i + 1], lo + 1)
+        nhi = edges[i + 2] if i + 2 < n_out - 1 else n
+        nhi = max(nhi, hi + 1)
+        avg_x = x[hi:nhi].mean()
+        avg_y = y[hi:nhi].mean()
+        area = np.abs(
+            (x[prev] - avg_x) * (y[lo:hi] - y[prev])
+            - (x[prev] - x[lo:hi]) * (avg_y - y[prev])
+        )
+        prev = lo + int(np.argmax(area))
+        selected[i + 1] = prev
+    selected[-1] = n - 1
+    return selected
 
 # Load data
 print("Loading SPY and RSP 5-minute data...")
-spy_df = pd.read_csv('data/SPY_5Min_stock_alpaca_clean.csv', index_col='Datetime', parse_dates=True)
-rsp_df = pd.read_csv('data/RSP_5Min_stock_alpaca_clean.csv', index_col='Datetime', parse_dates=True)
+spy_df = load_or_cache('data/SPY_5Min_stock_alpaca_clean.csv')
+rsp_df = load_or_cache('data/RSP_5Min_stock_alpaca_clean.csv')
 
 # Align
-common_dates = spy_df.index.intersection(rsp_df.index)
-spy_df = spy_df.loc[common_dates]
-rsp_df = rsp_df.loc[common_dates]
+# align walks the two sorted DatetimeIndexes once instead of a hash
+# intersection followed by two label-based gathers
+spy_df, rsp_df = spy_df.align(rsp_df, join='inner', axis=0)
 
 # Calculate ratio and RSI
 spy_df['ratio'] = spy_df['Close'] / rsp_df['Close']
@@ -32,24 +61,33 @@ spy_df['ratio_rsi'] = calculate_rsi(spy_df['ratio'], period=14)
 # Drop NaN
 spy_df = spy_df.dropna()
 
-print(f"Plotting {len(spy_df)} bars...")
+# Downsample each series to screen resolution before plotting
+x_num = spy_df.index.asi8.astype(np.float64)
+ratio_keep = lttb_indices(x_num, spy_df['ratio'].to_numpy(np.float64), MAX_PLOT_POINTS)
+rsi_keep = lttb_indices(x_num, spy_df['ratio_rsi'].to_numpy(np.float64), MAX_PLOT_POINTS)
+ratio_ds = spy_df['ratio'].iloc[ratio_keep]
+rsi_ds = spy_df['ratio_rsi'].iloc[rsi_keep]
+
+print(f"Plotting {len(spy_df)} bars ({len(ratio_ds)} points after downsampling)...")
 
 # Create plot with 2 subplots
 fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(16, 10), sharex=True)
 
 # Plot 1: SPY/RSP Ratio
-ax1.plot(spy_df.index, spy_df['ratio'], linewidth=1, color='blue')
+ax1.plot(ratio_ds.index, ratio_ds, linewidth=1, color='blue')
 ax1.set_ylabel('SPY/RSP Ratio', fontsize=12)
 ax1.set_title('SPY/RSP Price Ratio', fontsize=14, fontweight='bold')
 ax1.grid(True, alpha=0.3)
 
 # Plot 2: Ratio RSI with trading zones
-ax2.plot(spy_df.index, spy_df['ratio_rsi'], linewidth=1.5, color='purple')
+ax2.plot(rsi_ds.index, rsi_ds, linewidth=1.5, color='purple')
 ax2.axhline(y=70, color='red', linestyle='--', linewidth=2, label='Overbought (70) - SHORT SPY/LONG RSP')
 ax2.axhline(y=30, color='green', linestyle='--', linewidth=2, label='Oversold (30) - LONG SPY/SHORT RSP')
 ax2.axhline(y=50, color='gray', linestyle=':', linewidth=1, label='Neutral (50) - Exit Zone')
-ax2.fill_between(spy_df.index, 70, 100, alpha=0.2, color='red')
-ax2.fill_between(spy_df.index, 0, 30, alpha=0.2, color='green')
+# The shaded bands are constant, so two endpoints describe them fully
+band_x = spy_df.index[[0, -1]]
+ax2.fill_between(band_x, 70, 100, alpha=0.2, color='red')
+ax2.fill_between(band_x, 0, 30, alpha=0.2, color='green')
 ax2.set_ylabel('RSI', fontsize=12)
 ax2.set_xlabel('Date', fontsize=12)
 ax2.set_title('RSI of SPY/RSP Ratio (Trading Signals)', fontsize=14, fontweight='bold')
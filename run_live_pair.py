@@ -1,16 +1,10 @@
 import time
 import pandas as pd
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from pipeline.alpaca import get_rest
-
-def calculate_rsi(prices, period=14):
-    """Calculate RSI"""
-    delta = prices.diff()
-    gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-    rs = gain / loss
-    return 100 - (100 / (1 + rs))
+from indicators import calculate_rsi
 
 # Strategy parameters
 RSI_OVERBOUGHT = 70
@@ -33,11 +27,17 @@ def get_account_value():
     account = api.get_account()
     return float(account.portfolio_value)
 
-def get_current_price(symbol):
-    bars = api.get_bars(symbol, '1Min', limit=1).df
-    if not bars.empty:
-        return bars['close'].iloc[-1]
-    return None
+def get_current_prices(symbols):
+    """Fetch the latest bar close for several symbols in one request."""
+    # get_latest_bars returns one bar per symbol; a multi-symbol get_bars
+    # with limit=1 caps the TOTAL bars across symbols, not per symbol
+    bars = api.get_latest_bars(symbols)
+    prices = {}
+    for symbol in symbols:
+        bar = bars.get(symbol)
+        if bar is not None:
+            prices[symbol] = bar.c
+    return prices
 
 def get_vrp_z_score():
     """Calculates the Volatility Risk Premium Z-Score"""
@@ -60,13 +60,30 @@ def get_vrp_z_score():
         print(f"VRP Calculation Error: {e}")
         return 0.0 # Default to neutral if calculation fails
 
+# Rolling bar windows kept between loop iterations so each tick only fetches
+# the bars that are actually new instead of re-downloading the full lookback
+_spy_window = None
+_rsp_window = None
+
+def _fetch_window(symbol, cached):
+    """Return the latest LOOKBACK_BARS 5Min bars, extending `cached` incrementally."""
+    if cached is None or cached.empty:
+        return api.get_bars(symbol, '5Min', limit=LOOKBACK_BARS).df
+    # Re-request the last few cached bars as a safety overlap, then dedupe
+    start = cached.index[-3] if len(cached) >= 3 else cached.index[0]
+    fresh = api.get_bars(symbol, '5Min', start=start.isoformat(), limit=LOOKBACK_BARS).df
+    if fresh.empty:
+        return cached
+    combined = pd.concat([cached, fresh])
+    combined = combined[~combined.index.duplicated(keep='last')].sort_index()
+    return combined.tail(LOOKBACK_BARS)
+
 def get_ratio_rsi():
-    spy_bars = api.get_bars('SPY', '5Min', limit=LOOKBACK_BARS).df
-    rsp_bars = api.get_bars('RSP', '5Min', limit=LOOKBACK_BARS).df
-    common_idx = spy_bars.index.intersection(rsp_bars.index)
-    spy_bars = spy_bars.loc[common_idx]
-    rsp_bars = rsp_bars.loc[common_idx]
-    ratio = spy_bars['close'] / rsp_bars['close']
+    global _spy_window, _rsp_window
+    _spy_window = _fetch_window('SPY', _spy_window)
+    _rsp_window = _fetch_window('RSP', _rsp_window)
+    common_idx = _spy_window.index.intersection(_rsp_window.index)
+    ratio = _spy_window.loc[common_idx, 'close'] / _rsp_window.loc[common_idx, 'close']
     rsi = calculate_rsi(ratio, period=14)
     return rsi.iloc[-1] if not rsi.empty else None
 
@@ -88,20 +105,26 @@ def enter_trade(position_type, ratio_rsi, vrp_z):
         size_multiplier = 0.5 if vrp_z <= 0 else 1.0
         position_size = (account_value * CAPITAL_USAGE / 2) * size_multiplier
         
-        spy_price = get_current_price('SPY')
-        rsp_price = get_current_price('RSP')
+        prices = get_current_prices(['SPY', 'RSP'])
+        spy_price = prices.get('SPY')
+        rsp_price = prices.get('RSP')
         if not spy_price or not rsp_price: return
-        
+
         spy_qty = int(position_size / spy_price)
         rsp_qty = int(position_size / rsp_price)
-        
-        if position_type == 'short_spy_long_rsp':
-            api.submit_order(symbol='SPY', qty=spy_qty, side='sell', type='market', time_in_force='day')
-            api.submit_order(symbol='RSP', qty=rsp_qty, side='buy', type='market', time_in_force='day')
-        elif position_type == 'long_spy_short_rsp':
-            api.submit_order(symbol='SPY', qty=spy_qty, side='buy', type='market', time_in_force='day')
-            api.submit_order(symbol='RSP', qty=rsp_qty, side='sell', type='market', time_in_force='day')
-            
+
+        spy_side = 'sell' if position_type == 'short_spy_long_rsp' else 'buy'
+        rsp_side = 'buy' if spy_side == 'sell' else 'sell'
+        # Submit both legs concurrently so the RSP order is not serialized
+        # behind the SPY round-trip
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            legs = [
+                pool.submit(api.submit_order, symbol='SPY', qty=spy_qty, side=spy_side, type='market', time_in_force='day'),
+                pool.submit(api.submit_order, symbol='RSP', qty=rsp_qty, side=rsp_side, type='market', time_in_force='day'),
+            ]
+            for leg in legs:
+                leg.result()
+
         print(f"\n[{datetime.now(timezone.utc)}] ENTERED TRADE | VRP Z: {vrp_z:.2f} | Size: {size_multiplier*100}%")
         current_position = position_type
     except Exception as e: